@@ -0,0 +1,108 @@
+"""
+AI Agent Service Toolkit - Shared helpers for the setup and fix scripts.
+"""
+
+import functools
+import importlib.util
+import os
+import re
+import shutil
+import sys
+from pathlib import Path
+from typing import Final
+
+# Provider API keys, any one of which is enough to run the service
+API_KEYS: Final = ("OPENAI_API_KEY", "ANTHROPIC_API_KEY", "GOOGLE_API_KEY", "GROQ_API_KEY")
+
+# FastAPI service and Streamlit app
+SERVICE_PORTS: Final = (8080, 8501)
+
+# KEY=value assignments; comment and blank lines never match
+_ENV_LINE = re.compile(r"^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=(.*)$", re.MULTILINE)
+
+# Trailing " # comment" after an unquoted value
+_INLINE_COMMENT = re.compile(r"\s+#.*$")
+
+
+@functools.cache
+def python_ok() -> bool:
+    """Check if the running Python meets the 3.11+ requirement."""
+    return sys.version_info >= (3, 11)
+
+
+@functools.lru_cache(maxsize=1)
+def load_env() -> dict[str, str]:
+    """Read .env once and return its KEY=value pairs.
+
+    Raises FileNotFoundError if .env does not exist. Callers that write to .env
+    must call ``env_written()`` so the next read sees the new content.
+    """
+    content = Path(".env").read_text()
+    return {key: _env_value(value) for key, value in _ENV_LINE.findall(content)}
+
+
+def _env_value(raw: str) -> str:
+    """Normalize a raw .env value the way python-dotenv reads it."""
+    value = raw.strip()
+    if value[:1] in ("'", '"'):
+        end = value.find(value[0], 1)
+        if end != -1:
+            return value[1:end]
+    return _INLINE_COMMENT.sub("", value)
+
+
+def configured_keys(env: dict[str, str]) -> list[str]:
+    """Return the provider API keys set in ``env``, plus USE_FAKE_MODEL if enabled."""
+    found = [key for key in API_KEYS if env.get(key)]
+    if env.get("USE_FAKE_MODEL", "").lower() == "true":
+        found.append("USE_FAKE_MODEL")
+    return found
+
+
+@functools.lru_cache(maxsize=1)
+def env_exists() -> bool:
+    """Check if .env exists; the stat runs once until ``env_written()``."""
+    return os.path.isfile(".env")
+
+
+def env_written() -> None:
+    """Drop cached .env state after the file has been created or modified."""
+    env_exists.cache_clear()
+    load_env.cache_clear()
+
+
+@functools.cache
+def is_uv_installed() -> bool:
+    """Check if uv is on PATH; the PATH walk runs once per process."""
+    return shutil.which("uv") is not None
+
+
+def busy_ports(ports) -> set[int]:
+    """Return the subset of ``ports`` that already have a listener on this host."""
+    if importlib.util.find_spec("psutil") is not None:
+        import psutil
+
+        try:
+            # One kernel query covers every port, with no connect timeouts.
+            return {
+                conn.laddr.port
+                for conn in psutil.net_connections(kind="inet")
+                if conn.status == psutil.CONN_LISTEN and conn.laddr.port in ports
+            }
+        except psutil.AccessDenied:
+            pass  # e.g. macOS without root; fall back to bind probes
+
+    import socket
+
+    busy = set()
+    for port in ports:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            # Let TIME_WAIT leftovers through; only a live listener should block the
+            # bind. Windows' SO_REUSEADDR would also bind over listeners, so skip it there.
+            if sys.platform != "win32":
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
+                sock.bind(("localhost", port))
+            except OSError:
+                busy.add(port)
+    return busy
@@ -4,19 +4,126 @@ AI Agent Service Toolkit - Current Issues Fix Script
 This script diagnoses and fixes current issues in the running application.
 """
 
-import os
 import sys
 import subprocess
-import json
+import importlib.util
 import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from importlib.metadata import PackageNotFoundError, distribution
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Final
+
+from _common import (
+    SERVICE_PORTS,
+    busy_ports,
+    configured_keys,
+    env_exists,
+    env_written,
+    is_uv_installed,
+    load_env,
+    python_ok,
+)
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Import names checked by check_dependencies
+_REQUIRED_PACKAGES: Final = (
+    'langchain_core',
+    'langchain_anthropic',
+    'langchain_openai',
+    'langgraph',
+    'fastapi',
+    'streamlit',
+    'uvicorn',
+    'httpx',
+    'pydantic',
+)
+
+# (provider, dotted path to its chat model class) probed by check_model_imports
+_PROVIDERS: Final = (
+    ('OpenAI', 'langchain_openai.ChatOpenAI'),
+    ('Anthropic', 'langchain_anthropic.ChatAnthropic'),
+    ('Google', 'langchain_google_genai.ChatGoogleGenerativeAI'),
+    ('Groq', 'langchain_groq.ChatGroq'),
+)
+
+# Distributions installed by fix_missing_dependencies when uv sync fails
+_ESSENTIAL_PACKAGES: Final = (
+    "langchain-core",
+    "langchain-anthropic",
+    "langchain-openai",
+    "langchain-community",
+    "langgraph",
+    "fastapi",
+    "streamlit",
+    "uvicorn",
+    "httpx",
+    "pydantic",
+    "python-dotenv",
+)
+
+# Written by fix_missing_env when .env is absent
+_ENV_TEMPLATE: Final[bytes] = b"""# AI Agent Service Toolkit Configuration
+# Created by fix script
+
+# Enable fake model for testing
+USE_FAKE_MODEL=true
+
+# Add your API keys here when ready
+# OPENAI_API_KEY=your_openai_key_here
+# ANTHROPIC_API_KEY=your_anthropic_key_here
+# GOOGLE_API_KEY=your_google_key_here
+# GROQ_API_KEY=your_groq_key_here
+
+# Database configuration
+DATABASE_TYPE=sqlite
+SQLITE_DB_PATH=checkpoints.db
+
+# Server configuration
+HOST=0.0.0.0
+PORT=8080
+
+# Optional: Enable tracing
+# LANGCHAIN_TRACING_V2=true
+# LANGCHAIN_API_KEY=your_langsmith_key_here
+"""
+
+# Provider availability keyed on the dotted import path; filled on first check
+_PROVIDER_CACHE: dict[str, bool] = {}
+
+def _probe_provider(provider: str, import_path: str) -> bool:
+    """Import a provider's chat model class and report whether it is usable."""
+    module_name, class_name = import_path.rsplit('.', 1)
+    if importlib.util.find_spec(module_name) is None:
+        logger.warning(f"✗ {provider} provider unavailable: {module_name} not installed")
+        return False
+    try:
+        module = __import__(module_name, fromlist=[class_name])
+        getattr(module, class_name)
+        logger.info(f"✓ {provider} provider available")
+        return True
+    except Exception as e:
+        logger.warning(f"✗ {provider} provider unavailable: {e}")
+        return False
+
+# Issues raised by the check running in the current thread or task; main() gives
+# each check its own list so they can be merged in declaration order afterwards
+_check_issues: ContextVar[list[str]] = ContextVar('_check_issues')
+
+def _collect_issues(issues: list[str], check_func):
+    """Run a check with its issues going to ``issues``."""
+    _check_issues.set(issues)
+    return check_func()
+
+async def _collect_issues_async(issues: list[str], probe):
+    """Async counterpart of _collect_issues; gather() gives each probe its own context."""
+    _check_issues.set(issues)
+    return await probe()
+
 class SystemDiagnostics:
     """Comprehensive system diagnostics and fixes."""
     
@@ -24,68 +131,49 @@ class SystemDiagnostics:
         self.issues_found = []
         self.fixes_applied = []
         
+    def _add_issue(self, issue: str) -> None:
+        """Record an issue with the running check's collector, if main() set one."""
+        issues = _check_issues.get(None)
+        (self.issues_found if issues is None else issues).append(issue)
+    
     def check_python_version(self) -> bool:
         """Check if Python version is compatible."""
         version = sys.version_info
         logger.info(f"Python version: {version.major}.{version.minor}.{version.micro}")
         
-        if version.major < 3 or (version.major == 3 and version.minor < 11):
-            self.issues_found.append("Python version too old (requires 3.11+)")
+        if not python_ok():
+            self._add_issue("Python version too old (requires 3.11+)")
             return False
         return True
     
     def check_dependencies(self) -> bool:
         """Check if all required dependencies are installed."""
-        required_packages = [
-            'langchain_core',
-            'langchain_anthropic', 
-            'langchain_openai',
-            'langgraph',
-            'fastapi',
-            'streamlit',
-            'uvicorn',
-            'httpx',
-            'pydantic'
-        ]
-        
+        # Presence != import: only the installed *.dist-info metadata is read,
+        # so no package code (or langchain's import graph) is executed here.
         missing_packages = []
-        for package in required_packages:
+        for package in _REQUIRED_PACKAGES:
             try:
-                __import__(package)
+                # Distribution names use dashes (langchain_core -> langchain-core)
+                distribution(package.replace('_', '-'))
                 logger.info(f"✓ {package} installed")
-            except ImportError:
+            except PackageNotFoundError:
                 missing_packages.append(package)
                 logger.error(f"✗ {package} missing")
         
         if missing_packages:
-            self.issues_found.append(f"Missing packages: {', '.join(missing_packages)}")
+            self._add_issue(f"Missing packages: {', '.join(missing_packages)}")
             return False
         return True
     
     def check_env_file(self) -> bool:
         """Check if .env file exists and has required configuration."""
-        env_path = Path(".env")
-        
-        if not env_path.exists():
-            self.issues_found.append(".env file missing")
+        if not env_exists():
+            self._add_issue(".env file missing")
             return False
         
         # Check for at least one API key or fake model
-        with open(env_path, 'r') as f:
-            content = f.read()
-        
-        api_keys = [
-            'OPENAI_API_KEY=',
-            'ANTHROPIC_API_KEY=',
-            'GOOGLE_API_KEY=',
-            'GROQ_API_KEY=',
-            'USE_FAKE_MODEL=true'
-        ]
-        
-        has_config = any(key in content and content.split(key, 1)[1].split('\n')[0].strip() for key in api_keys)
-        
-        if not has_config:
-            self.issues_found.append("No API keys or fake model configured in .env")
+        if not configured_keys(load_env()):
+            self._add_issue("No API keys or fake model configured in .env")
             return False
         
         logger.info("✓ .env file configured")
@@ -93,77 +181,65 @@ class SystemDiagnostics:
     
     def check_ports(self) -> bool:
         """Check if required ports are available."""
-        import socket
+        busy = busy_ports(SERVICE_PORTS)
         
-        ports_to_check = [8080, 8501]
-        busy_ports = []
-        
-        for port in ports_to_check:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(1)
-            result = sock.connect_ex(('localhost', port))
-            sock.close()
-            
-            if result == 0:
-                busy_ports.append(port)
+        for port in SERVICE_PORTS:
+            if port in busy:
                 logger.warning(f"Port {port} is in use")
             else:
                 logger.info(f"✓ Port {port} available")
         
-        if busy_ports:
-            self.issues_found.append(f"Ports in use: {', '.join(map(str, busy_ports))}")
+        if busy:
+            self._add_issue(f"Ports in use: {', '.join(map(str, sorted(busy)))}")
             return False
         return True
     
-    def check_database_connection(self) -> bool:
+    async def check_database_connection(self) -> bool:
         """Check database connectivity."""
+        # Fake-model runs don't need a live database; skip the connect and setup()
+        if env_exists() and load_env().get('USE_FAKE_MODEL', '').lower() == 'true':
+            logger.info("✓ Database check skipped (fake model)")
+            return True
+        
+        if importlib.util.find_spec('memory') is None:
+            logger.error("✗ Database check failed: memory package not found (is src/ on PYTHONPATH?)")
+            self._add_issue("Database check error: memory package not found")
+            return False
+        
         try:
             # Import here to avoid issues if dependencies are missing
             from memory import initialize_database
-            
-            async def test_db():
-                try:
-                    async with initialize_database() as db:
-                        if hasattr(db, 'setup'):
-                            await db.setup()
-                        logger.info("✓ Database connection successful")
-                        return True
-                except Exception as e:
-                    logger.error(f"✗ Database connection failed: {e}")
-                    self.issues_found.append(f"Database connection error: {e}")
-                    return False
-            
-            return asyncio.run(test_db())
         except Exception as e:
             logger.error(f"✗ Database check failed: {e}")
-            self.issues_found.append(f"Database check error: {e}")
+            self._add_issue(f"Database check error: {e}")
+            return False
+        
+        try:
+            async with initialize_database() as db:
+                if hasattr(db, 'setup'):
+                    await db.setup()
+                logger.info("✓ Database connection successful")
+                return True
+        except Exception as e:
+            logger.error(f"✗ Database connection failed: {e}")
+            self._add_issue(f"Database connection error: {e}")
             return False
     
     def check_model_imports(self) -> bool:
         """Check if model providers can be imported."""
-        providers = {
-            'OpenAI': 'langchain_openai.ChatOpenAI',
-            'Anthropic': 'langchain_anthropic.ChatAnthropic',
-            'Google': 'langchain_google_genai.ChatGoogleGenerativeAI',
-            'Groq': 'langchain_groq.ChatGroq'
-        }
-        
         working_providers = []
         failed_providers = []
         
-        for provider, import_path in providers.items():
-            try:
-                module_name, class_name = import_path.rsplit('.', 1)
-                module = __import__(module_name, fromlist=[class_name])
-                getattr(module, class_name)
+        for provider, import_path in _PROVIDERS:
+            if import_path not in _PROVIDER_CACHE:
+                _PROVIDER_CACHE[import_path] = _probe_provider(provider, import_path)
+            if _PROVIDER_CACHE[import_path]:
                 working_providers.append(provider)
-                logger.info(f"✓ {provider} provider available")
-            except Exception as e:
+            else:
                 failed_providers.append(provider)
-                logger.warning(f"✗ {provider} provider unavailable: {e}")
         
         if not working_providers:
-            self.issues_found.append("No model providers available")
+            self._add_issue("No model providers available")
             return False
         
         logger.info(f"Available providers: {', '.join(working_providers)}")
@@ -178,33 +254,9 @@ class IssueFixer:
     def fix_missing_env(self) -> bool:
         """Create .env file with fake model enabled."""
         try:
-            env_content = """# AI Agent Service Toolkit Configuration
-# Created by fix script
-
-# Enable fake model for testing
-USE_FAKE_MODEL=true
-
-# Add your API keys here when ready
-# OPENAI_API_KEY=your_openai_key_here
-# ANTHROPIC_API_KEY=your_anthropic_key_here
-# GOOGLE_API_KEY=your_google_key_here
-# GROQ_API_KEY=your_groq_key_here
-
-# Database configuration
-DATABASE_TYPE=sqlite
-SQLITE_DB_PATH=checkpoints.db
-
-# Server configuration
-HOST=0.0.0.0
-PORT=8080
-
-# Optional: Enable tracing
-# LANGCHAIN_TRACING_V2=true
-# LANGCHAIN_API_KEY=your_langsmith_key_here
-"""
-            
-            with open('.env', 'w') as f:
-                f.write(env_content)
+            with open('.env', 'wb') as f:
+                f.write(_ENV_TEMPLATE)
+            env_written()
             
             self.fixes_applied.append("Created .env file with fake model")
             logger.info("✓ Created .env file")
@@ -220,34 +272,39 @@ PORT=8080
             
             # Try uv first
             try:
-                subprocess.run([sys.executable, "-m", "pip", "install", "uv"], 
-                              check=True, capture_output=True)
+                if not is_uv_installed():
+                    subprocess.run([sys.executable, "-m", "pip", "install", "uv"], 
+                                  check=True, capture_output=True)
+                    is_uv_installed.cache_clear()
                 subprocess.run(["uv", "sync", "--frozen"], 
                               check=True, capture_output=True)
                 self.fixes_applied.append("Installed dependencies with uv")
                 logger.info("✓ Dependencies installed with uv")
                 return True
-            except subprocess.CalledProcessError:
-                logger.warning("uv failed, trying pip...")
+            except (subprocess.CalledProcessError, FileNotFoundError):
+                # Install just the essentials with uv's resolver before falling back to pip
+                if is_uv_installed():
+                    logger.warning("uv sync failed, trying uv pip install...")
+                    try:
+                        subprocess.run(["uv", "pip", "install", "--python", sys.executable, *_ESSENTIAL_PACKAGES], 
+                                      check=True, capture_output=True)
+                        self.fixes_applied.append("Installed dependencies with uv pip")
+                        logger.info("✓ Dependencies installed with uv pip")
+                        return True
+                    except subprocess.CalledProcessError:
+                        pass
                 
-                # Fallback to pip
-                essential_packages = [
-                    "langchain-core",
-                    "langchain-anthropic", 
-                    "langchain-openai",
-                    "langchain-community",
-                    "langgraph",
-                    "fastapi",
-                    "streamlit",
-                    "uvicorn",
-                    "httpx",
-                    "pydantic",
-                    "python-dotenv"
-                ]
+                logger.warning("uv failed, trying pip...")
                 
-                for package in essential_packages:
-                    subprocess.run([sys.executable, "-m", "pip", "install", package], 
+                # Fallback to pip with one pip process and one resolver pass for the whole set
+                try:
+                    subprocess.run([sys.executable, "-m", "pip", "install", *_ESSENTIAL_PACKAGES], 
                                   check=True, capture_output=True)
+                except subprocess.CalledProcessError:
+                    # Retry one by one so the error names the failing package
+                    for package in _ESSENTIAL_PACKAGES:
+                        subprocess.run([sys.executable, "-m", "pip", "install", package], 
+                                      check=True, capture_output=True)
                 
                 self.fixes_applied.append("Installed dependencies with pip")
                 logger.info("✓ Dependencies installed with pip")
@@ -259,30 +316,50 @@ PORT=8080
     
     def fix_port_conflicts(self) -> bool:
         """Kill processes using required ports."""
+        if importlib.util.find_spec('psutil') is None:
+            logger.warning("psutil not available, cannot automatically free ports")
+            return False
+        
         try:
             import psutil
             
-            ports_to_free = [8080, 8501]
             killed_processes = []
             
-            for port in ports_to_free:
-                for proc in psutil.process_iter(['pid', 'name', 'connections']):
+            try:
+                # One socket table read instead of walking every process's connections
+                connections = [(conn.pid, conn) for conn in psutil.net_connections(kind='inet')]
+            except psutil.AccessDenied:
+                # e.g. macOS without root: walk the processes we are allowed to inspect
+                # (Process.net_connections is psutil 6.0+; older releases call it connections)
+                method = 'net_connections' if hasattr(psutil.Process, 'net_connections') else 'connections'
+                connections = []
+                for proc in psutil.process_iter():
                     try:
-                        for conn in proc.info['connections'] or []:
-                            if conn.laddr.port == port:
-                                proc.terminate()
-                                killed_processes.append(f"PID {proc.info['pid']} on port {port}")
-                                logger.info(f"Killed process {proc.info['pid']} using port {port}")
+                        connections.extend(
+                            (proc.pid, conn) for conn in getattr(proc, method)(kind='inet')
+                        )
                     except (psutil.NoSuchProcess, psutil.AccessDenied):
                         continue
             
+            listeners = {
+                pid: conn.laddr.port
+                for pid, conn in connections
+                if pid and conn.laddr and conn.laddr.port in SERVICE_PORTS
+                and conn.status == psutil.CONN_LISTEN
+            }
+            
+            for pid, port in listeners.items():
+                try:
+                    psutil.Process(pid).terminate()
+                    killed_processes.append(f"PID {pid} on port {port}")
+                    logger.info(f"Killed process {pid} using port {port}")
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+            
             if killed_processes:
                 self.fixes_applied.append(f"Freed ports: {', '.join(killed_processes)}")
             
             return True
-        except ImportError:
-            logger.warning("psutil not available, cannot automatically free ports")
-            return False
         except Exception as e:
             logger.error(f"Failed to free ports: {e}")
             return False
@@ -308,6 +385,13 @@ PORT=8080
             logger.error(f"Failed to fix database issues: {e}")
             return False
 
+async def _run_all_async_checks(probes, check_issues) -> list:
+    """Run every async probe under one event loop; exceptions are returned, not raised."""
+    return await asyncio.gather(
+        *(_collect_issues_async(issues, probe) for probe, issues in zip(probes, check_issues)),
+        return_exceptions=True,
+    )
+
 def main():
     """Main diagnostic and fix routine."""
     print("🔧 AI Agent Service Toolkit - Issue Diagnosis & Fix")
@@ -325,19 +409,50 @@ def main():
         ("Dependencies", diagnostics.check_dependencies),
         ("Port Availability", diagnostics.check_ports),
         ("Model Providers", diagnostics.check_model_imports),
+    ]
+    async_checks = [
         ("Database Connection", diagnostics.check_database_connection),
     ]
     
-    failed_checks = []
-    for check_name, check_func in checks:
+    # Checks are mostly I/O-bound and independent, so run them side by side.
+    # The async probes share one event loop, started once on its own worker
+    # thread so it never nests inside another loop.
+    check_issues = {check_name: [] for check_name, _ in checks + async_checks}
+    with ThreadPoolExecutor(max_workers=len(checks) + 1) as executor:
+        futures = [
+            (check_name, executor.submit(_collect_issues, check_issues[check_name], check_func))
+            for check_name, check_func in checks
+        ]
+        async_future = executor.submit(
+            asyncio.run,
+            _run_all_async_checks(
+                [check_func for _, check_func in async_checks],
+                [check_issues[check_name] for check_name, _ in async_checks],
+            ),
+        )
+    
+    # Merge issues in declaration order, not thread completion order
+    for issues in check_issues.values():
+        diagnostics.issues_found.extend(issues)
+    
+    results = []
+    for check_name, future in futures:
         try:
-            if check_func():
-                print(f"✅ {check_name}: OK")
-            else:
-                print(f"❌ {check_name}: FAILED")
-                failed_checks.append(check_name)
+            results.append((check_name, future.result()))
         except Exception as e:
-            print(f"❌ {check_name}: ERROR - {e}")
+            results.append((check_name, e))
+    results.extend(zip([check_name for check_name, _ in async_checks], async_future.result()))
+    
+    # Report in declaration order so the output stays stable
+    failed_checks = []
+    for check_name, outcome in results:
+        if isinstance(outcome, BaseException):
+            print(f"❌ {check_name}: ERROR - {outcome}")
+            failed_checks.append(check_name)
+        elif outcome:
+            print(f"✅ {check_name}: OK")
+        else:
+            print(f"❌ {check_name}: FAILED")
             failed_checks.append(check_name)
     
     # Apply fixes
@@ -6,15 +6,88 @@ This script helps diagnose and fix common setup issues.
 import sys
 import os
 import subprocess
-import socket
 from pathlib import Path
+from typing import Final
+
+from _common import (
+    SERVICE_PORTS,
+    busy_ports,
+    configured_keys,
+    env_exists,
+    env_written,
+    load_env,
+    python_ok,
+)
+
+# Written by check_env_file when neither .env nor .env.example exists
+_BASIC_ENV_TEMPLATE: Final[bytes] = b"""# Add your API keys here
+OPENAI_API_KEY=
+ANTHROPIC_API_KEY=
+GOOGLE_API_KEY=
+GROQ_API_KEY=
+"""
+
+# Startup scripts written by create_startup_scripts; the batch file keeps CRLF endings
+_WINDOWS_SCRIPT: Final[bytes] = (b"""@echo off
+echo Starting AI Agent Service Toolkit...
+echo.
+
+echo Activating virtual environment...
+call .venv\\Scripts\\activate.bat
+
+echo Starting FastAPI service...
+start "FastAPI Service" cmd /k "python src\\run_service.py"
+
+echo Waiting for service to start...
+timeout /t 5 /nobreak > nul
+
+echo Starting Streamlit app...
+start "Streamlit App" cmd /k "streamlit run src\\streamlit_app.py"
+
+echo.
+echo Services are starting...
+echo FastAPI service: http://localhost:8080
+echo Streamlit app: http://localhost:8501
+echo.
+pause
+""").replace(b"\n", b"\r\n")
+
+_UNIX_SCRIPT: Final[bytes] = b"""#!/bin/bash
+echo "Starting AI Agent Service Toolkit..."
+echo
+
+echo "Activating virtual environment..."
+source .venv/bin/activate
+
+echo "Starting FastAPI service in background..."
+python src/run_service.py &
+SERVICE_PID=$!
+
+echo "Waiting for service to start..."
+sleep 5
+
+echo "Starting Streamlit app..."
+streamlit run src/streamlit_app.py &
+APP_PID=$!
+
+echo
+echo "Services are running:"
+echo "FastAPI service: http://localhost:8081"
+echo "Streamlit app: http://localhost:8501"
+echo
+echo "Press Ctrl+C to stop all services"
+
+# Wait for interrupt
+trap "kill $SERVICE_PID $APP_PID; exit" INT
+wait
+"""
 
 def check_python_version():
     """Check if Python version is compatible."""
     version = sys.version_info
     print(f"✓ Python version: {version.major}.{version.minor}.{version.micro}")
     
-    if version.major < 3 or (version.major == 3 and version.minor < 11):
+    if not python_ok():
         print("❌ ERROR: Python 3.11 or higher is required!")
         print("Please install Python 3.11+ from https://python.org/downloads/")
         return False
@@ -24,7 +97,7 @@ def check_env_file():
     """Check if .env file exists and has required API keys."""
     env_path = Path(".env")
     
-    if not env_path.exists():
+    if not env_exists():
         print("❌ ERROR: .env file not found!")
         print("Creating .env file from .env.example...")
         
@@ -36,35 +109,14 @@ def check_env_file():
             print("✓ Created .env file from .env.example")
         else:
             # Create basic .env file
-            with open(env_path, 'w') as f:
-                f.write("# Add your API keys here\n")
-                f.write("OPENAI_API_KEY=\n")
-                f.write("ANTHROPIC_API_KEY=\n")
-                f.write("GOOGLE_API_KEY=\n")
-                f.write("GROQ_API_KEY=\n")
+            with open(env_path, 'wb') as f:
+                f.write(_BASIC_ENV_TEMPLATE)
 
             print("✓ Created basic .env file")
+        env_written()
     
     # Check for API keys
-    api_keys_found = []
-    with open(env_path, 'r') as f:
-        content = f.read()
-        
-    key_patterns = [
-        "OPENAI_API_KEY=",
-        "ANTHROPIC_API_KEY=", 
-        "GOOGLE_API_KEY=",
-        "GROQ_API_KEY=",
-        "USE_FAKE_MODEL=true"
-    ]
-    
-    for pattern in key_patterns:
-        for line in content.split('\n'):
-            if line.startswith(pattern):
-                if '=' in line and line.split('=', 1)[1].strip():
-                    api_keys_found.append(pattern.rstrip('='))
-                if pattern == "USE_FAKE_MODEL=true":
-                    api_keys_found.append("USE_FAKE_MODEL")
+    api_keys_found = configured_keys(load_env())
     
     if not api_keys_found:
         print("⚠️  WARNING: No API keys found in .env file!")
@@ -74,6 +126,7 @@ def check_env_file():
         with open(env_path, 'a') as f:
             f.write("\n# Temporary setting for testing\n")
             f.write("USE_FAKE_MODEL=true\n")
+        env_written()
         
         print("✓ Added fake model setting for testing")
         return True
@@ -112,91 +165,38 @@ def install_dependencies():
 def check_ports():
     """Check if required ports are available."""
     
-    ports_to_check = [8080, 8501]
+    busy = busy_ports(SERVICE_PORTS)
     
-    for port in ports_to_check:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(1)
-        result = sock.connect_ex(('localhost', port))
-        sock.close()
-        
-        if result == 0:
+    for port in SERVICE_PORTS:
+        if port in busy:
             print(f"⚠️  WARNING: Port {port} is already in use!")
             print(f"   You may need to stop other services or change the port.")
         else:
             print(f"✓ Port {port} is available")
 
+def _write_if_changed(path, data):
+    """Write data to path unless it already holds exactly that; return whether it wrote."""
+    if os.path.isfile(path) and Path(path).read_bytes() == data:
+        return False
+    Path(path).write_bytes(data)
+    return True
+
 def create_startup_scripts():
     """Create convenient startup scripts."""
     
-    # Windows batch script
-    windows_script = """@echo off
-echo Starting AI Agent Service Toolkit...
-echo.
-
-echo Activating virtual environment...
-call .venv\\Scripts\\activate.bat
-
-echo Starting FastAPI service...
-start "FastAPI Service" cmd /k "python src\\run_service.py"
-
-echo Waiting for service to start...
-timeout /t 5 /nobreak > nul
-
-echo Starting Streamlit app...
-start "Streamlit App" cmd /k "streamlit run src\\streamlit_app.py"
-
-echo.
-echo Services are starting...
-echo FastAPI service: http://localhost:8080
-echo Streamlit app: http://localhost:8501
-echo.
-pause
-"""
+    windows_written = _write_if_changed("start_windows.bat", _WINDOWS_SCRIPT)
+    unix_written = _write_if_changed("start_unix.sh", _UNIX_SCRIPT)
     
-    # Unix shell script
-    unix_script = """#!/bin/bash
-echo "Starting AI Agent Service Toolkit..."
-echo
-
-echo "Activating virtual environment..."
-source .venv/bin/activate
-
-echo "Starting FastAPI service in background..."
-python src/run_service.py &
-SERVICE_PID=$!
-
-echo "Waiting for service to start..."
-sleep 5
-
-echo "Starting Streamlit app..."
-streamlit run src/streamlit_app.py &
-APP_PID=$!
-
-echo
-echo "Services are running:"
-echo "FastAPI service: http://localhost:8081"
-echo "Streamlit app: http://localhost:8501"
-echo
-echo "Press Ctrl+C to stop all services"
-
-# Wait for interrupt
-trap "kill $SERVICE_PID $APP_PID; exit" INT
-wait
-"""
-    
-    # Write scripts
-    with open("start_windows.bat", "w") as f:
-        f.write(windows_script)
-    
-    with open("start_unix.sh", "w") as f:
-        f.write(unix_script)
+    # Make unix script executable; skip the chmod only if nothing needs changing
+    if unix_written or not os.access("start_unix.sh", os.X_OK):
+        try:
+            os.chmod("start_unix.sh", 0o755)
+        except:
+            pass
     
-    # Make unix script executable
-    try:
-        os.chmod("start_unix.sh", 0o755)
-    except:
-        pass
+    if not (windows_written or unix_written):
+        print("✓ Startup scripts already up to date")
+        return
     
     print("✓ Created startup scripts:")
     print("  - start_windows.bat (for Windows)")
@@ -7,18 +7,43 @@ import subprocess
 import sys
 import os
 from pathlib import Path
+from typing import Final
+
+from _common import env_exists, env_written, is_uv_installed
+
+# Installed directly (uv pip, then pip) when uv sync fails
+_PACKAGES: Final = (
+    "langchain-anthropic",
+    "langchain-openai",
+    "langchain-google-genai",
+    "langchain-groq",
+    "langchain-community",
+    "langchain-core",
+    "langgraph",
+    "fastapi",
+    "streamlit",
+    "uvicorn",
+    "httpx",
+    "pydantic",
+    "python-dotenv",
+)
 
 def run_command(cmd, description):
-    """Run a command and handle errors."""
+    """Run a command (an argument list, no shell) and handle errors."""
     print(f"🔄 {description}...")
     try:
-        result = subprocess.run(cmd, shell=True, check=True, capture_output=True, text=True)
+        subprocess.run(cmd, check=True, capture_output=True, text=True)
         print(f"✅ {description} - Success")
         return True
     except subprocess.CalledProcessError as e:
         print(f"❌ {description} - Failed")
         print(f"Error: {e.stderr}")
         return False
+    except FileNotFoundError as e:
+        # Without a shell, a missing executable raises instead of exiting 127
+        print(f"❌ {description} - Failed")
+        print(f"Error: {e}")
+        return False
 
 def main():
     print("🚀 Quick Fix for Missing Dependencies")
@@ -30,39 +55,32 @@ def main():
         return False
     
     # Step 1: Create .env file if missing
-    if not Path(".env").exists():
+    if not env_exists():
         print("📝 Creating .env file...")
         with open(".env", "w") as f:
             f.write("USE_FAKE_MODEL=true\n")
+        env_written()
         print("✅ Created .env file with fake model")
     
     # Step 2: Install uv if not available
-    print("🔧 Installing uv package manager...")
-    run_command(f"{sys.executable} -m pip install uv", "Installing uv")
+    if not is_uv_installed():
+        print("🔧 Installing uv package manager...")
+        run_command([sys.executable, "-m", "pip", "install", "uv"], "Installing uv")
+        is_uv_installed.cache_clear()
+    else:
+        print("✅ uv is already installed")
     
     # Step 3: Install all dependencies
     print("📦 Installing project dependencies...")
-    if not run_command("uv sync --frozen", "Installing with uv"):
+    if not run_command(["uv", "sync", "--frozen"], "Installing with uv"):
         print("⚠️  uv failed, trying alternative method...")
-        # Alternative: install specific missing packages
-        packages = [
-            "langchain-anthropic",
-            "langchain-openai", 
-            "langchain-google-genai",
-            "langchain-groq",
-            "langchain-community",
-            "langchain-core",
-            "langgraph",
-            "fastapi",
-            "streamlit",
-            "uvicorn",
-            "httpx",
-            "pydantic",
-            "python-dotenv"
-        ]
-        
-        for package in packages:
-            run_command(f"{sys.executable} -m pip install {package}", f"Installing {package}")
+        # Alternative: install specific missing packages, with uv's resolver if available
+        uv_cmd = ["uv", "pip", "install", "--python", sys.executable, *_PACKAGES]
+        installed = is_uv_installed() and run_command(uv_cmd, "Installing packages with uv pip")
+        if not installed and not run_command([sys.executable, "-m", "pip", "install", *_PACKAGES], "Installing packages"):
+            # Retry one by one so the failing package is reported
+            for package in _PACKAGES:
+                run_command([sys.executable, "-m", "pip", "install", package], f"Installing {package}")
     
     # Step 4: Try to run a quick test
     print("\n🧪 Testing import...")
@@ -73,7 +91,7 @@ def main():
         print("✅ Dependencies are working!")
     except subprocess.CalledProcessError:
         print("⚠️  Still having import issues, trying pip install...")
-        run_command(f"{sys.executable} -m pip install langchain-anthropic", "Installing langchain-anthropic with pip")
+        run_command([sys.executable, "-m", "pip", "install", "langchain-anthropic"], "Installing langchain-anthropic with pip")
     
     print("\n" + "=" * 40)
     print("🎉 Fix completed! Try running the service now:")
@@ -0,0 +1,154 @@
+import socket
+import sys
+import types
+from importlib.machinery import ModuleSpec
+
+import pytest
+
+from _common import busy_ports, configured_keys, env_exists, env_written, load_env
+
+
+@pytest.fixture
+def env_dir(tmp_path, monkeypatch):
+    """Run in an empty directory with the .env caches cleared around the test."""
+    monkeypatch.chdir(tmp_path)
+    env_written()
+    yield tmp_path
+    env_written()
+
+
+def test_load_env_skips_comments_and_blank_lines(env_dir):
+    (env_dir / ".env").write_text(
+        "# OPENAI_API_KEY=your_openai_key_here\n"
+        "\n"
+        "   \n"
+        "GROQ_API_KEY=gsk_123\n"
+        "  DEFAULT_MODEL = groq-llama\n"
+        "not an assignment\n"
+    )
+    assert load_env() == {"GROQ_API_KEY": "gsk_123", "DEFAULT_MODEL": "groq-llama"}
+
+
+def test_load_env_strips_quotes_and_inline_comments(env_dir):
+    (env_dir / ".env").write_text(
+        "USE_FAKE_MODEL=true  # testing\n"
+        'OPENAI_API_KEY=""\n'
+        "ANTHROPIC_API_KEY='sk-ant'\n"
+        'GOOGLE_API_KEY="key # not a comment"\n'
+        "GROQ_API_KEY=gsk#123\n"
+    )
+    assert load_env() == {
+        "USE_FAKE_MODEL": "true",
+        "OPENAI_API_KEY": "",
+        "ANTHROPIC_API_KEY": "sk-ant",
+        "GOOGLE_API_KEY": "key # not a comment",
+        "GROQ_API_KEY": "gsk#123",
+    }
+
+
+def test_load_env_missing_file(env_dir):
+    assert not env_exists()
+    with pytest.raises(FileNotFoundError):
+        load_env()
+
+
+def test_configured_keys():
+    assert configured_keys({}) == []
+    assert configured_keys({"OPENAI_API_KEY": "", "GROQ_API_KEY": "gsk_123"}) == ["GROQ_API_KEY"]
+    assert configured_keys({"USE_FAKE_MODEL": "True"}) == ["USE_FAKE_MODEL"]
+    assert configured_keys({"USE_FAKE_MODEL": "false"}) == []
+
+
+def test_configured_keys_ignores_commented_placeholders(env_dir):
+    (env_dir / ".env").write_text(
+        "# OPENAI_API_KEY=your_openai_key_here\nUSE_FAKE_MODEL=true  # testing\n"
+    )
+    assert configured_keys(load_env()) == ["USE_FAKE_MODEL"]
+
+
+def test_env_written_invalidates_cache(env_dir):
+    env_path = env_dir / ".env"
+    assert not env_exists()
+
+    env_path.write_text("GROQ_API_KEY=first\n")
+    # Still cached from before the write
+    assert not env_exists()
+    env_written()
+    assert env_exists()
+    assert load_env() == {"GROQ_API_KEY": "first"}
+
+    env_path.write_text("GROQ_API_KEY=second\n")
+    assert load_env() == {"GROQ_API_KEY": "first"}
+    env_written()
+    assert load_env() == {"GROQ_API_KEY": "second"}
+
+
+def _fake_psutil(connections=None, denied=False):
+    psutil = types.ModuleType("psutil")
+    psutil.__spec__ = ModuleSpec("psutil", None)
+    psutil.CONN_LISTEN = "LISTEN"
+
+    class AccessDenied(Exception):
+        pass
+
+    def net_connections(kind="inet"):
+        if denied:
+            raise AccessDenied()
+        return connections
+
+    psutil.AccessDenied = AccessDenied
+    psutil.net_connections = net_connections
+    return psutil
+
+
+def _conn(port, status):
+    return types.SimpleNamespace(laddr=types.SimpleNamespace(port=port), status=status)
+
+
+def test_busy_ports_with_psutil(monkeypatch):
+    psutil = _fake_psutil([_conn(8080, "LISTEN"), _conn(8501, "TIME_WAIT"), _conn(9000, "LISTEN")])
+    monkeypatch.setitem(sys.modules, "psutil", psutil)
+    assert busy_ports((8080, 8501)) == {8080}
+
+
+@pytest.fixture
+def listening_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("localhost", 0))
+        sock.listen()
+        yield sock.getsockname()[1]
+
+
+@pytest.fixture
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("localhost", 0))
+        port = sock.getsockname()[1]
+    return port
+
+
+def test_busy_ports_without_psutil(monkeypatch, listening_port, free_port):
+    monkeypatch.setitem(sys.modules, "psutil", None)
+    assert busy_ports((listening_port, free_port)) == {listening_port}
+
+
+def test_busy_ports_psutil_access_denied_falls_back(monkeypatch, listening_port, free_port):
+    monkeypatch.setitem(sys.modules, "psutil", _fake_psutil(denied=True))
+    assert busy_ports((listening_port, free_port)) == {listening_port}
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="SO_REUSEADDR is not used on Windows")
+def test_busy_ports_ignores_time_wait(monkeypatch):
+    monkeypatch.setitem(sys.modules, "psutil", None)
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server:
+        # Like uvicorn's listener, so its TIME_WAIT sockets allow address reuse
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind(("localhost", 0))
+        server.listen()
+        port = server.getsockname()[1]
+        client = socket.create_connection(("localhost", port))
+        conn, _ = server.accept()
+        # Closing the accepted side first leaves the port in TIME_WAIT
+        conn.close()
+        client.close()
+    assert busy_ports((port,)) == set()
@@ -0,0 +1,117 @@
+import sys
+import threading
+import types
+from importlib.machinery import ModuleSpec
+
+import pytest
+
+import fix_current_issues
+from fix_current_issues import IssueFixer, SystemDiagnostics
+
+
+def _conn(port, status, pid=None):
+    return types.SimpleNamespace(laddr=types.SimpleNamespace(port=port), status=status, pid=pid)
+
+
+def _fake_psutil(connections, denied=False, legacy=False):
+    """A psutil stand-in. ``connections`` maps pid -> that process's sockets."""
+    psutil = types.ModuleType("psutil")
+    psutil.__spec__ = ModuleSpec("psutil", None)
+    psutil.CONN_LISTEN = "LISTEN"
+    psutil.terminated = []
+
+    class AccessDenied(Exception):
+        pass
+
+    class NoSuchProcess(Exception):
+        pass
+
+    class Process:
+        def __init__(self, pid):
+            self.pid = pid
+
+        def terminate(self):
+            psutil.terminated.append(self.pid)
+
+        def _connections(self, kind="inet"):
+            return connections[self.pid]
+
+    # psutil < 6.0 only has Process.connections()
+    setattr(Process, "connections" if legacy else "net_connections", Process._connections)
+
+    def net_connections(kind="inet"):
+        if denied:
+            raise AccessDenied()
+        return [conn for pid, conns in connections.items() for conn in conns]
+
+    psutil.AccessDenied = AccessDenied
+    psutil.NoSuchProcess = NoSuchProcess
+    psutil.Process = Process
+    psutil.net_connections = net_connections
+    psutil.process_iter = lambda: [Process(pid) for pid in connections]
+    return psutil
+
+
+CONNECTIONS = {
+    101: [_conn(8080, "LISTEN", 101)],
+    102: [_conn(8501, "ESTABLISHED", 102)],
+    103: [_conn(9000, "LISTEN", 103)],
+    104: [_conn(8501, "LISTEN", 104)],
+}
+
+
+@pytest.mark.parametrize(
+    "psutil_kwargs",
+    [{}, {"denied": True}, {"denied": True, "legacy": True}],
+    ids=["net_connections", "access_denied", "access_denied_psutil5"],
+)
+def test_fix_port_conflicts_terminates_service_port_listeners(monkeypatch, psutil_kwargs):
+    psutil = _fake_psutil(CONNECTIONS, **psutil_kwargs)
+    monkeypatch.setitem(sys.modules, "psutil", psutil)
+
+    fixer = IssueFixer()
+    assert fixer.fix_port_conflicts()
+    assert sorted(psutil.terminated) == [101, 104]
+    assert fixer.fixes_applied == ["Freed ports: PID 101 on port 8080, PID 104 on port 8501"]
+
+
+def test_fix_port_conflicts_without_psutil(monkeypatch):
+    monkeypatch.setitem(sys.modules, "psutil", None)
+    assert not IssueFixer().fix_port_conflicts()
+
+
+def test_main_reports_issues_in_check_order(monkeypatch, capsys):
+    model_check_done = threading.Event()
+
+    def check_python_version(self):
+        # Finish after the model provider check so thread order is reversed
+        assert model_check_done.wait(timeout=5)
+        self._add_issue("Python version too old (requires 3.11+)")
+        return False
+
+    def check_model_imports(self):
+        self._add_issue("No model providers available")
+        model_check_done.set()
+        return False
+
+    async def check_database_connection(self):
+        self._add_issue("Database check error: memory package not found")
+        return False
+
+    monkeypatch.setattr(SystemDiagnostics, "check_python_version", check_python_version)
+    monkeypatch.setattr(SystemDiagnostics, "check_model_imports", check_model_imports)
+    monkeypatch.setattr(SystemDiagnostics, "check_database_connection", check_database_connection)
+    for name in ("check_env_file", "check_dependencies", "check_ports"):
+        monkeypatch.setattr(SystemDiagnostics, name, lambda self: True)
+    monkeypatch.setattr(IssueFixer, "fix_database_issues", lambda self: True)
+
+    assert not fix_current_issues.main()
+
+    out = capsys.readouterr().out
+    report = out[out.index("manual intervention") :]
+    issues = [line.removeprefix("  • ") for line in report.splitlines() if line.startswith("  • ")]
+    assert issues == [
+        "Python version too old (requires 3.11+)",
+        "No model providers available",
+        "Database check error: memory package not found",
+    ]
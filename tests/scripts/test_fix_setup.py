@@ -0,0 +1,64 @@
+import os
+import sys
+
+import pytest
+
+import fix_setup
+from fix_setup import _UNIX_SCRIPT, _WINDOWS_SCRIPT, _write_if_changed, create_startup_scripts
+
+
+@pytest.fixture
+def script_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_write_if_changed(script_dir):
+    path = script_dir / "script.sh"
+    assert _write_if_changed(str(path), b"echo one\n")
+    assert path.read_bytes() == b"echo one\n"
+
+    mtime = path.stat().st_mtime_ns
+    assert not _write_if_changed(str(path), b"echo one\n")
+    assert path.stat().st_mtime_ns == mtime
+
+    assert _write_if_changed(str(path), b"echo two\n")
+    assert path.read_bytes() == b"echo two\n"
+
+
+def test_windows_script_uses_crlf():
+    assert b"\r\n" in _WINDOWS_SCRIPT
+    assert b"\n" not in _WINDOWS_SCRIPT.replace(b"\r\n", b"")
+    assert b"\r\n" not in _UNIX_SCRIPT
+
+
+def test_create_startup_scripts_writes_then_reports_up_to_date(script_dir, capsys):
+    create_startup_scripts()
+    assert "Created startup scripts" in capsys.readouterr().out
+    assert (script_dir / "start_windows.bat").read_bytes() == _WINDOWS_SCRIPT
+    assert (script_dir / "start_unix.sh").read_bytes() == _UNIX_SCRIPT
+
+    create_startup_scripts()
+    assert "Startup scripts already up to date" in capsys.readouterr().out
+
+
+def test_create_startup_scripts_skips_chmod_when_unchanged(script_dir, monkeypatch):
+    create_startup_scripts()
+    if sys.platform != "win32":
+        assert os.access(script_dir / "start_unix.sh", os.X_OK)
+
+    chmod_calls = []
+    monkeypatch.setattr(fix_setup.os, "chmod", lambda *args: chmod_calls.append(args))
+    create_startup_scripts()
+    assert chmod_calls == []
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="no POSIX exec bit on Windows")
+def test_create_startup_scripts_restores_exec_bit(script_dir, capsys):
+    create_startup_scripts()
+    unix_script = script_dir / "start_unix.sh"
+    unix_script.chmod(0o644)
+
+    create_startup_scripts()
+    assert os.access(unix_script, os.X_OK)
+    assert "Startup scripts already up to date" in capsys.readouterr().out